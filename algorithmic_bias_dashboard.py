@@ -15,18 +15,27 @@ Features:
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
 from plotly.subplots import make_subplots
 import numpy as np
 import sys
 import os
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 class YouTubeAlgorithmicBiasDashboard:
     """Interactive dashboard for analyzing algorithmic bias in YouTube data"""
 
+    # Version of the prepared-data cache format. Bump whenever
+    # identify_columns, prepare_data or categorize_columns change so
+    # caches written by older code are ignored.
+    CACHE_VERSION = 1
+
     def __init__(self, data_path):
         """Initialize dashboard with data"""
         self.data_path = data_path
+        self.cache_path = f'{data_path}.v{self.CACHE_VERSION}.parquet'
         self.df = None
         self.load_data()
 
@@ -34,7 +43,12 @@ class YouTubeAlgorithmicBiasDashboard:
         """Load and prepare data"""
         try:
             print(f"Loading data from {self.data_path}...")
-            self.df = pd.read_csv(self.data_path)
+
+            # Reuse the cleaned data from a previous run if the CSV is unchanged
+            if self.load_cache():
+                return
+
+            self.df = self.read_csv()
             print(f"Loaded {len(self.df)} rows")
             print(f"Columns: {', '.join(self.df.columns)}")
 
@@ -47,6 +61,8 @@ class YouTubeAlgorithmicBiasDashboard:
             # Clean and prepare data
             self.prepare_data()
 
+            self.save_cache()
+
         except FileNotFoundError:
             print(f"Error: File '{self.data_path}' not found.")
             print("\nPlease export the Numbers file to CSV first.")
@@ -56,64 +72,195 @@ class YouTubeAlgorithmicBiasDashboard:
             print(f"Error loading data: {e}")
             sys.exit(1)
 
+    def read_csv(self):
+        """Read the CSV, preferring the pyarrow engine when it can handle the file"""
+        try:
+            # Arrow's multithreaded reader parses large exports much faster
+            df = pd.read_csv(self.data_path, engine='pyarrow')
+        except (ImportError, ValueError):
+            # pyarrow is missing or rejects input the C engine accepts,
+            # e.g. short rows with trailing empty fields dropped
+            return pd.read_csv(self.data_path)
+
+        # Unlike the C engine, pyarrow does not rename duplicate headers to '.1'
+        if df.columns.duplicated().any():
+            return pd.read_csv(self.data_path)
+        return df
+
+    @staticmethod
+    def parquet_available():
+        """Return True if pandas has a parquet engine to use"""
+        return any(importlib.util.find_spec(engine) for engine in ('pyarrow', 'fastparquet'))
+
+    def load_cache(self):
+        """Load prepared data from the parquet cache if it is newer than the CSV"""
+        if not self.parquet_available() or not os.path.exists(self.cache_path):
+            return False
+        if os.path.getmtime(self.cache_path) < os.path.getmtime(self.data_path):
+            return False
+
+        try:
+            self.df = pd.read_parquet(self.cache_path)
+        except Exception as e:
+            print(f"Warning: Could not read cache {self.cache_path}: {e}")
+            return False
+
+        print(f"Loaded {len(self.df)} prepared rows from cache {self.cache_path}")
+        self.identify_columns()
+
+        # Parquet does not round-trip every categorical (e.g. integer positions)
+        self.categorize_columns()
+        return True
+
+    def save_cache(self):
+        """Save prepared data to a parquet cache next to the CSV"""
+        # Caching is optional; skip it quietly without a parquet engine
+        if not self.parquet_available():
+            return
+
+        try:
+            self.df.to_parquet(self.cache_path, compression='zstd')
+        except Exception as e:
+            print(f"Warning: Could not write cache {self.cache_path}: {e}")
+
     def identify_columns(self):
         """Identify relevant columns from the dataset"""
-        cols = [c.lower() for c in self.df.columns]
-
-        # Common column name patterns
-        self.race_col = None
-        self.query_col = None
-        self.views_col = None
-        self.type_col = None
-
-        # Find race/ethnicity column
-        for pattern in ['race', 'ethnicity', 'demographic']:
-            matches = [c for c in self.df.columns if pattern in c.lower()]
-            if matches:
-                self.race_col = matches[0]
-                break
-
-        # Find query column
-        for pattern in ['query', 'search', 'keyword']:
-            matches = [c for c in self.df.columns if pattern in c.lower()]
-            if matches:
-                self.query_col = matches[0]
-                break
-
-        # Find views column
-        for pattern in ['view', 'count', 'views']:
-            matches = [c for c in self.df.columns if pattern in c.lower()]
-            if matches:
-                self.views_col = matches[0]
-                break
-
-        # Find content type column (Shorts vs Regular)
-        for pattern in ['type', 'format', 'short']:
-            matches = [c for c in self.df.columns if pattern in c.lower()]
-            if matches:
-                self.type_col = matches[0]
-                break
+        # Lowercase each column name once
+        lower = {c: c.lower() for c in self.df.columns}
+
+        # Common column name patterns, in priority order
+        column_patterns = {
+            'race_col': ('race', 'ethnicity', 'demographic'),
+            'query_col': ('query', 'search', 'keyword'),
+            'views_col': ('view', 'count'),
+            'type_col': ('type', 'format', 'short'),      # Shorts vs Regular
+        }
+
+        # Earlier patterns win; within a pattern the first matching column wins
+        for attr, patterns in column_patterns.items():
+            matches = (c for pattern in patterns for c, name in lower.items() if pattern in name)
+            setattr(self, attr, next(matches, None))
+
+        # Search result position (optional): the first column, in column
+        # order, that mentions either pattern
+        self.position_col = next((c for c, name in lower.items() if 'position' in name or 'rank' in name), None)
 
         print(f"\nIdentified columns:")
         print(f"  Race/Ethnicity: {self.race_col}")
         print(f"  Search Query: {self.query_col}")
         print(f"  View Count: {self.views_col}")
         print(f"  Content Type: {self.type_col}")
+        print(f"  Position: {self.position_col}")
+
+        # Keep only the columns the dashboard uses to shrink the working set
+        keep = [c for c in [self.race_col, self.query_col, self.views_col, self.type_col, self.position_col] if c]
+        self.df = self.df[list(dict.fromkeys(keep))]
 
     def prepare_data(self):
         """Clean and prepare data for analysis"""
         # Convert views to numeric if needed
         if self.views_col and self.views_col in self.df.columns:
-            self.df[self.views_col] = pd.to_numeric(
-                self.df[self.views_col].astype(str).str.replace(',', '').str.replace('K', '000').str.replace('M', '000000'),
-                errors='coerce'
-            )
+            # CSV readers already return plain counts as numbers; only parse text
+            if not pd.api.types.is_numeric_dtype(self.df[self.views_col]):
+                views = self.df[self.views_col].astype(str).str.replace(',', '', regex=False).str.strip()
+
+                # Scale values with a K/M/B suffix (e.g. "1.5M"); the rest parse as-is
+                multiplier = views.str[-1].map({'K': 1e3, 'M': 1e6, 'B': 1e9})
+                has_suffix = multiplier.notna()
+                views = views.where(~has_suffix, views.str[:-1].str.rstrip())
+                self.df[self.views_col] = pd.to_numeric(views, errors='coerce') * multiplier.fillna(1.0)
+
+            # Store whole, complete view counts in the smallest unsigned integer
+            # type that fits; pandas keeps float64 if any value is fractional
+            if self.df[self.views_col].notna().all():
+                self.df[self.views_col] = pd.to_numeric(self.df[self.views_col], downcast='unsigned')
 
-        # Fill NaN values
-        self.df = self.df.fillna('Unknown')
+        # Fill NaN values in text columns
+        text_cols = self.df.select_dtypes(include=['object', 'string']).columns
+        self.df[text_cols] = self.df[text_cols].fillna('Unknown')
+
+        self.categorize_columns()
 
         print(f"\nData prepared successfully")
 
+    def categorize_columns(self):
+        """Store low-cardinality columns as categoricals"""
+        # Groupby, value counts and comparisons then work on integer codes
+        for col in [self.race_col, self.query_col, self.type_col, self.position_col]:
+            if col and col in self.df.columns:
+                values = self.df[col].astype('category')
+
+                # Missing values of any dtype (e.g. blank positions on Shorts)
+                # become an explicit 'Unknown' group instead of code -1
+                if values.isna().any():
+                    # Label numeric categories as text so they can share a
+                    # column with 'Unknown' (and still round-trip through parquet)
+                    categories = values.cat.categories
+                    if pd.api.types.is_numeric_dtype(categories):
+                        if (categories % 1 == 0).all():
+                            categories = categories.astype('int64')
+                        values = values.cat.rename_categories(list(categories.astype(str)))
+
+                    if 'Unknown' not in values.cat.categories:
+                        values = values.cat.add_categories('Unknown')
+                    values = values.fillna('Unknown')
+
+                self.df[col] = values
+
+    def _flat_codes(self, row_col, col_col):
+        """Return combined (row, col) category codes, a validity mask and both category indexes"""
+        rows = self.df[row_col].cat
+        cols = self.df[col_col].cat
+        row_codes = rows.codes.to_numpy(dtype=np.int64)
+        col_codes = cols.codes.to_numpy(dtype=np.int64)
+
+        # Missing values have code -1 and must not land in a neighbouring cell
+        valid = (row_codes >= 0) & (col_codes >= 0)
+        flat = row_codes * len(cols.categories) + col_codes
+        return flat, valid, rows.categories, cols.categories
+
+    def _code_count_matrix(self, row_col, col_col):
+        """Return a dense count matrix of two categorical columns as a DataFrame"""
+        flat, valid, row_cats, col_cats = self._flat_codes(row_col, col_col)
+        shape = (len(row_cats), len(col_cats))
+
+        # Count each (row, col) code pair with one flat bincount
+        counts = np.bincount(flat[valid], minlength=shape[0] * shape[1]).reshape(shape)
+
+        return pd.DataFrame(counts, index=row_cats, columns=col_cats)
+
+    def _code_mean_matrix(self, row_col, col_col, value_col):
+        """Return a dense matrix of value_col means over two categorical columns"""
+        flat, valid, row_cats, col_cats = self._flat_codes(row_col, col_col)
+        shape = (len(row_cats), len(col_cats))
+        values = pd.to_numeric(self.df[value_col], errors='coerce').to_numpy(dtype=np.float64)
+
+        # Accumulate sums and counts per cell, skipping missing values
+        valid &= ~np.isnan(values)
+        sums = np.bincount(flat[valid], weights=values[valid], minlength=shape[0] * shape[1])
+        counts = np.bincount(flat[valid], minlength=shape[0] * shape[1])
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = (sums / counts).reshape(shape)
+
+        return pd.DataFrame(means, index=row_cats, columns=col_cats)
+
+    def _cat_value_counts(self, col):
+        """Return the categories of a categorical column and their counts"""
+        cat = self.df[col].cat
+        codes = cat.codes.to_numpy(dtype=np.int64)
+
+        # Skip missing values (code -1), which bincount cannot index
+        counts = np.bincount(codes[codes >= 0], minlength=len(cat.categories))
+        return cat.categories, counts
+
+    def _short_mask(self):
+        """Return a boolean mask of rows whose content type mentions Shorts"""
+        # Test each category label once, then compare integer codes
+        cat = self.df[self.type_col].cat
+        short_codes = [i for i, c in enumerate(cat.categories) if 'short' in str(c).lower()]
+        return np.isin(cat.codes.to_numpy(), short_codes)
+
     def create_racial_distribution_chart(self):
         """Create bar chart showing racial distribution across search queries"""
         if not self.race_col or not self.query_col:
@@ -121,7 +268,7 @@ class YouTubeAlgorithmicBiasDashboard:
             return None
 
         # Group by query and race
-        dist_data = self.df.groupby([self.query_col, self.race_col]).size().reset_index(name='count')
+        dist_data = self.df.groupby([self.query_col, self.race_col], observed=True).size().reset_index(name='count')
 
         fig = px.bar(
             dist_data,
@@ -150,19 +297,27 @@ class YouTubeAlgorithmicBiasDashboard:
             return None
 
         # Filter out invalid view counts
-        valid_data = self.df[self.df[self.views_col] > 0].copy()
+        valid_data = self.df[self.df[self.views_col] > 0]
 
         fig = go.Figure()
 
-        races = valid_data[self.race_col].unique()
         colors = px.colors.qualitative.Set1
 
-        for i, race in enumerate(races):
-            race_data = valid_data[valid_data[self.race_col] == race][self.views_col]
+        # Compute every race's box statistics in a single grouped pass
+        box_stats = valid_data.groupby(self.race_col, sort=False, observed=True)[self.views_col].describe()
 
+        # Send precomputed box statistics instead of every raw view count
+        for i, (race, stats) in enumerate(box_stats.iterrows()):
             fig.add_trace(go.Box(
-                y=race_data,
-                name=race,
+                x=[str(race)],
+                name=str(race),
+                lowerfence=[stats['min']],
+                q1=[stats['25%']],
+                median=[stats['50%']],
+                q3=[stats['75%']],
+                upperfence=[stats['max']],
+                mean=[stats['mean']],
+                sd=[stats['std']],
                 marker_color=colors[i % len(colors)],
                 boxmean='sd'
             ))
@@ -175,9 +330,10 @@ class YouTubeAlgorithmicBiasDashboard:
             showlegend=False
         )
 
-        # Use log scale if there's high variance
-        if valid_data[self.views_col].max() / valid_data[self.views_col].min() > 100:
-            fig.update_yaxis(type='log', title='View Count (log scale)')
+        # Use log scale if views span more than two orders of magnitude;
+        # the per-race min/max are already known and strictly positive
+        if len(box_stats) and np.ptp(np.log10(box_stats[['min', 'max']].to_numpy())) > 2:
+            fig.update_yaxes(type='log', title='View Count (log scale)')
 
         return fig
 
@@ -196,11 +352,11 @@ class YouTubeAlgorithmicBiasDashboard:
         )
 
         # Overall pie chart
-        type_counts = self.df[self.type_col].value_counts()
+        type_labels, type_counts = self._cat_value_counts(self.type_col)
         fig.add_trace(
             go.Pie(
-                labels=type_counts.index,
-                values=type_counts.values,
+                labels=type_labels,
+                values=type_counts,
                 marker=dict(colors=px.colors.qualitative.Pastel),
                 textposition='inside',
                 textinfo='label+percent'
@@ -210,7 +366,7 @@ class YouTubeAlgorithmicBiasDashboard:
 
         # Stacked bar by race
         if self.race_col:
-            type_race_data = self.df.groupby([self.race_col, self.type_col]).size().unstack(fill_value=0)
+            type_race_data = self._code_count_matrix(self.race_col, self.type_col)
 
             for content_type in type_race_data.columns:
                 fig.add_trace(
@@ -244,15 +400,10 @@ class YouTubeAlgorithmicBiasDashboard:
 
         # Create pivot table for heatmap
         if self.views_col:
-            heatmap_data = self.df.pivot_table(
-                values=self.views_col,
-                index=self.race_col,
-                columns=self.query_col,
-                aggfunc='mean'
-            )
+            heatmap_data = self._code_mean_matrix(self.race_col, self.query_col, self.views_col)
             title_suffix = '(Avg View Count)'
         else:
-            heatmap_data = self.df.groupby([self.race_col, self.query_col]).size().unstack(fill_value=0)
+            heatmap_data = self._code_count_matrix(self.race_col, self.query_col)
             title_suffix = '(Video Count)'
 
         fig = go.Figure(data=go.Heatmap(
@@ -278,15 +429,11 @@ class YouTubeAlgorithmicBiasDashboard:
 
     def create_position_bias_heatmap(self):
         """Create heatmap for position bias if position data exists"""
-        position_cols = [c for c in self.df.columns if 'position' in c.lower() or 'rank' in c.lower()]
-
-        if not position_cols or not self.race_col:
+        if not self.position_col or not self.race_col:
             return None
 
-        position_col = position_cols[0]
-
         # Create position x race heatmap
-        pos_race_data = self.df.groupby([self.race_col, position_col]).size().unstack(fill_value=0)
+        pos_race_data = self._code_count_matrix(self.race_col, self.position_col)
 
         fig = go.Figure(data=go.Heatmap(
             z=pos_race_data.values,
@@ -312,28 +459,28 @@ class YouTubeAlgorithmicBiasDashboard:
         if not self.race_col:
             return None
 
-        stats_list = []
+        # Aggregate every race in one grouped pass into typed columns,
+        # keeping races in order of first appearance
+        grouped = self.df.groupby(self.race_col, observed=True, sort=False)
 
-        for race in self.df[self.race_col].unique():
-            race_data = self.df[self.df[self.race_col] == race]
-
-            stats = {
-                'Race/Ethnicity': race,
-                'Total Videos': len(race_data)
-            }
-
-            if self.views_col:
-                stats['Avg Views'] = f"{race_data[self.views_col].mean():,.0f}"
-                stats['Median Views'] = f"{race_data[self.views_col].median():,.0f}"
-                stats['Total Views'] = f"{race_data[self.views_col].sum():,.0f}"
-
-            if self.type_col:
-                shorts_count = len(race_data[race_data[self.type_col].str.contains('Short', case=False, na=False)])
-                stats['Shorts %'] = f"{(shorts_count / len(race_data) * 100):.1f}%"
+        if self.views_col:
+            stats_df = grouped.agg(**{
+                'Total Videos': (self.views_col, 'size'),
+                'Avg Views': (self.views_col, 'mean'),
+                'Median Views': (self.views_col, 'median'),
+                'Total Views': (self.views_col, 'sum'),
+            })
+            for col in ['Avg Views', 'Median Views', 'Total Views']:
+                stats_df[col] = stats_df[col].map('{:,.0f}'.format)
+        else:
+            stats_df = grouped.size().to_frame('Total Videos')
 
-            stats_list.append(stats)
+        if self.type_col:
+            is_short = pd.Series(self._short_mask(), index=self.df.index)
+            shorts_pct = is_short.groupby(self.df[self.race_col], observed=True).mean() * 100
+            stats_df['Shorts %'] = shorts_pct.map('{:.1f}%'.format)
 
-        stats_df = pd.DataFrame(stats_list)
+        stats_df = stats_df.rename_axis('Race/Ethnicity').reset_index()
 
         fig = go.Figure(data=[go.Table(
             header=dict(
@@ -361,46 +508,27 @@ class YouTubeAlgorithmicBiasDashboard:
         """Generate complete interactive dashboard"""
         print("\nGenerating dashboard...")
 
-        # Create all visualizations
-        charts = []
-
-        # 1. Racial Distribution
-        fig1 = self.create_racial_distribution_chart()
-        if fig1:
-            charts.append(fig1)
-
-        # 2. View Count Disparities
-        fig2 = self.create_view_count_disparity_chart()
-        if fig2:
-            charts.append(fig2)
-
-        # 3. Shorts vs Regular
-        fig3 = self.create_shorts_vs_regular_breakdown()
-        if fig3:
-            charts.append(fig3)
-
-        # 4. Algorithmic Pattern Heatmap
-        fig4 = self.create_algorithmic_pattern_heatmap()
-        if fig4:
-            charts.append(fig4)
-
-        # 5. Position Bias Heatmap
-        fig5 = self.create_position_bias_heatmap()
-        if fig5:
-            charts.append(fig5)
-
-        # 6. Stats Table
-        fig6 = self.create_comprehensive_stats_table()
-        if fig6:
-            charts.append(fig6)
+        chart_builders = [
+            self.create_racial_distribution_chart,     # 1. Racial Distribution
+            self.create_view_count_disparity_chart,    # 2. View Count Disparities
+            self.create_shorts_vs_regular_breakdown,   # 3. Shorts vs Regular
+            self.create_algorithmic_pattern_heatmap,   # 4. Algorithmic Pattern Heatmap
+            self.create_position_bias_heatmap,         # 5. Position Bias Heatmap
+            self.create_comprehensive_stats_table,     # 6. Stats Table
+        ]
+
+        # Create all visualizations concurrently; pandas releases the GIL
+        # in its aggregation kernels
+        with ThreadPoolExecutor(max_workers=min(len(chart_builders), os.cpu_count() or 1)) as executor:
+            futures = [executor.submit(builder) for builder in chart_builders]
+            charts = [fig for fig in (future.result() for future in futures) if fig]
 
         if not charts:
             print("Error: Could not create any visualizations. Check your data format.")
             return
 
-        # Combine all charts into one HTML file
-        with open(output_file, 'w') as f:
-            f.write(f'''
+        # Combine all charts into one HTML document
+        parts = [f'''
 <!DOCTYPE html>
 <html>
 <head>
@@ -462,23 +590,28 @@ class YouTubeAlgorithmicBiasDashboard:
         <p><strong>Total Records:</strong> {len(self.df):,}</p>
         <p><strong>Data Source:</strong> {self.data_path}</p>
     </div>
-''')
+''']
 
-            for i, chart in enumerate(charts):
-                f.write(f'    <div class="chart-container" id="chart{i}"></div>\n')
+        for i, chart in enumerate(charts):
+            parts.append(f'    <div class="chart-container" id="chart{i}"></div>\n')
 
-            f.write('    <script>\n')
+        parts.append('    <script>\n')
 
-            for i, chart in enumerate(charts):
-                chart_json = chart.to_json()
-                f.write(f'        Plotly.newPlot("chart{i}", {chart_json});\n')
+        for i, chart in enumerate(charts):
+            # Figures are built by us, so skip re-validation on export
+            chart_json = pio.to_json(chart, validate=False)
+            parts.append(f'        Plotly.newPlot("chart{i}", {chart_json});\n')
 
-            f.write('''
+        parts.append('''
     </script>
 </body>
 </html>
 ''')
 
+        # Write the whole document in a single call
+        with open(output_file, 'w') as f:
+            f.write(''.join(parts))
+
         print(f"\n✓ Dashboard created successfully: {output_file}")
         print(f"  Open the file in your browser to view the interactive dashboard")
         return output_file